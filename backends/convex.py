@@ -1,15 +1,18 @@
+import concurrent.futures
 import functools
+import glob
+import hashlib
+import io
 import os
 import platform
+import socket
 import subprocess
 import threading
 import time
-import zipfile
 from typing import Union
 
 import requests
-from convex import ConvexClient
-from portpicker import pick_unused_port
+from requests.adapters import HTTPAdapter
 
 from backends import Backend
 from evaluation.api import ApiDescription, HttpMethod
@@ -19,26 +22,16 @@ from evaluation.task import Task
 class ConvexBackend(Backend):
     @classmethod
     def api_prompt(cls, endpoints: list[ApiDescription]) -> str:
-        out = []
-        for endpoint in endpoints:
-            if endpoint.method == HttpMethod.GET:
-                function_type = "Query"
-            elif endpoint.method == HttpMethod.POST:
-                function_type = "Mutation"
-            else:
-                raise ValueError(f"Invalid HTTP method: {endpoint.method}")
-
-            path = f"api.answer.{endpoint.name}"
-            out.append(f"- {function_type} `{path}`: {endpoint.description}")
-
-        return "\n".join(out)
+        return render_api_prompt(tuple(endpoints))
 
+    # The guidelines and examples don't change during a run, so only render them once.
     @classmethod
+    @functools.cache
     def description(cls) -> str:
         lines = []
         lines.append("Use Convex for building the backend.")
         lines.append("")
-        lines.append("".join(render_guidelines(CONVEX_GUIDELINES)))
+        lines.append(RENDERED_CONVEX_GUIDELINES)
         lines.append("")
         lines.append("".join(render_examples("../evals-convex/examples/")))
         lines.append("## Versions")
@@ -53,67 +46,136 @@ class ConvexBackend(Backend):
         os.makedirs(self.backend_dir, exist_ok=True)
 
     def start(self):
+        self.spawn()
+        self.wait_until_ready()
+
+    # Spawn every backend before waiting on any of them so that their startups overlap.
+    @staticmethod
+    def start_many(backends: list["ConvexBackend"]):
+        for backend in backends:
+            backend.spawn()
+        if not backends:
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(backends)) as executor:
+            futures = [executor.submit(backend.wait_until_ready) for backend in backends]
+            for future in futures:
+                future.result()
+
+    def spawn(self):
         if self.process:
             raise RuntimeError("Backend already running")
 
         storage_dir = os.path.abspath(os.path.join(self.backend_dir, "convex_local_storage"))
         os.makedirs(storage_dir, exist_ok=True)
         sqlite_path = os.path.abspath(os.path.join(self.backend_dir, "convex_local_backend.sqlite3"))
-        convex_binary = download_convex_binary()
-        with port_lock:
-            port = pick_unused_port()
-            site_proxy_port = pick_unused_port()
-            self.process = subprocess.Popen(
-                [
-                    convex_binary,
-                    "--port",
-                    str(port),
-                    "--site-proxy-port",
-                    str(site_proxy_port),
-                    "--instance-name",
-                    instance_name,
-                    "--instance-secret",
-                    instance_secret,
-                    "--local-storage",
-                    storage_dir,
-                    sqlite_path,
-                ],
-                cwd=self.backend_dir,
-                stdout=open(os.path.join(self.backend_dir, "backend.stdout.log"), "w"),
-                stderr=open(os.path.join(self.backend_dir, "backend.stderr.log"), "w"),
-            )
+        convex_binary = prefetch_binary().result()
+        port_socket = reserve_port()
+        site_proxy_socket = reserve_port()
+        port = port_socket.getsockname()[1]
+        site_proxy_port = site_proxy_socket.getsockname()[1]
+        self.port = port
+        self.site_proxy_port = site_proxy_port
+
+        try:
+            # Hand the child raw log fds and skip the close_fds sweep; everything else we have open is
+            # non-inheritable (PEP 446), so the child only inherits its stdio.
+            log_flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+            stdout_fd = os.open(os.path.join(self.backend_dir, "backend.stdout.log"), log_flags, 0o644)
+            stderr_fd = os.open(os.path.join(self.backend_dir, "backend.stderr.log"), log_flags, 0o644)
 
-        deadline = time.time() + 10
-        num_attempts = 0
+            # Release our reservations right before the backend binds the ports.
+            port_socket.close()
+            site_proxy_socket.close()
+            try:
+                self.process = subprocess.Popen(
+                    [
+                        convex_binary,
+                        "--port",
+                        str(port),
+                        "--site-proxy-port",
+                        str(site_proxy_port),
+                        "--instance-name",
+                        instance_name,
+                        "--instance-secret",
+                        instance_secret,
+                        "--local-storage",
+                        storage_dir,
+                        sqlite_path,
+                    ],
+                    cwd=self.backend_dir,
+                    stdout=stdout_fd,
+                    stderr=stderr_fd,
+                    close_fds=False,
+                )
+            finally:
+                os.close(stdout_fd)
+                os.close(stderr_fd)
+        except BaseException:
+            # The backend never started, so `stop()` won't run: give the ports back here.
+            port_socket.close()
+            site_proxy_socket.close()
+            release_ports(port, site_proxy_port)
+            raise
+
+    def wait_until_ready(self):
+        port = self.port
+
+        # Poll on a short fixed interval rather than backing off exponentially so that we notice
+        # the backend coming up promptly, and only issue the HTTP request once the port accepts
+        # connections.
+        started = time.time()
+        deadline = started + 10
         while True:
             try:
-                requests.get(f"http://localhost:{port}/version").raise_for_status()
+                if not port_is_listening(port):
+                    raise RuntimeError(f"Backend not listening on port {port}")
+                session.get(f"http://localhost:{port}/version", timeout=request_timeout).raise_for_status()
                 break
             except Exception as e:
-                remaining = deadline - time.time()
+                now = time.time()
+                remaining = deadline - now
                 if remaining < 0:
                     raise e
-                time.sleep(min(0.1 * (2**num_attempts), remaining))
-                num_attempts += 1
+                interval = 0.025 if now - started < 1 else 0.1
+                time.sleep(min(interval, remaining))
 
         # Check that our process is still running after passing health checks.abs
         if self.process.poll() is not None:
             raise RuntimeError("Backend process failed to start")
 
-        self.port = port
-        self.site_proxy_port = site_proxy_port
+        from convex import ConvexClient
+
+        # The client keeps a single persistent WebSocket connection to the backend that multiplexes
+        # every query and mutation, so graders can share it across threads without per-call
+        # connection setup.
         self.client = ConvexClient(f"http://localhost:{port}")
+        self.client_calls = {HttpMethod.GET: self.client.query, HttpMethod.POST: self.client.mutation}
 
     def deploy(self):
-        done = subprocess.run(
-            ["bun", "install"],
-            cwd=self.project_dir,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            encoding="utf-8",
-        )
-        if done.returncode != 0:
-            raise Exception(f"Failed to install dependencies:\n{done.stdout}")
+        # Skip `bun install` if `node_modules` was installed from the same package.json and lockfile.
+        install_marker = os.path.join(self.project_dir, "node_modules", ".bun_install_hash")
+        try:
+            with open(install_marker, "r") as f:
+                installed_hash = f.read()
+        except FileNotFoundError:
+            installed_hash = None
+
+        if installed_hash != dependency_hash(self.project_dir):
+            done = subprocess.run(
+                ["bun", "install"],
+                cwd=self.project_dir,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                encoding="utf-8",
+            )
+            if done.returncode != 0:
+                raise Exception(f"Failed to install dependencies:\n{done.stdout}")
+
+            # Hash again since `bun install` may have created or updated the lockfile. A project
+            # without dependencies may not get a `node_modules` at all, so there's nothing to cache.
+            if os.path.isdir(os.path.dirname(install_marker)):
+                with open(install_marker, "w") as f:
+                    f.write(dependency_hash(self.project_dir))
 
         done = subprocess.run(
             [
@@ -135,30 +197,124 @@ class ConvexBackend(Backend):
             raise Exception(f"Failed to deploy:\n{done.stdout}")
 
     def call_api(self, task: Task, name: str, input):
-        endpoint = next((endpoint for endpoint in task.api_description() if endpoint.name == name), None)
+        endpoint = task.endpoints_by_name.get(name)
         if endpoint is None:
-            raise ValueError(f"Endpoint {name} not found in task {task.name}")
-        path = f"answer:{endpoint.name}"
-        if endpoint.method == HttpMethod.GET:
-            result = self.client.query(path, input)
-        elif endpoint.method == HttpMethod.POST:
-            result = self.client.mutation(path, input)
-        else:
+            raise ValueError(f"Endpoint {name} not found in task {type(task).__name__}")
+        call = self.client_calls.get(endpoint.method)
+        if call is None:
             raise ValueError(f"Invalid HTTP method: {endpoint.method}")
-        return result
+        return call(f"answer:{endpoint.name}", input)
 
     def stop(self):
         if not self.process:
             raise RuntimeError("Backend not running")
         self.process.terminate()
         self.process = None
+        release_ports(self.port, self.site_proxy_port)
 
 
-port_lock = threading.Lock()
+def dependency_hash(project_dir: str) -> str:
+    h = hashlib.sha256()
+    for name in ("package.json", "bun.lock", "bun.lockb"):
+        try:
+            with open(os.path.join(project_dir, name), "rb") as f:
+                contents = f.read()
+        except FileNotFoundError:
+            continue
+        h.update(f"{name}:{len(contents)}\n".encode())
+        h.update(contents)
+    return h.hexdigest()
+
+
+@functools.lru_cache(maxsize=256)
+def render_api_prompt(endpoints: tuple[ApiDescription, ...]) -> str:
+    out = []
+    for endpoint in endpoints:
+        if endpoint.method is HttpMethod.GET:
+            function_type = "Query"
+        elif endpoint.method is HttpMethod.POST:
+            function_type = "Mutation"
+        else:
+            raise ValueError(f"Invalid HTTP method: {endpoint.method}")
+
+        path = f"api.answer.{endpoint.name}"
+        out.append(f"- {function_type} `{path}`: {endpoint.description}")
+
+    return "\n".join(out)
+
+
+ports_in_use_lock = threading.Lock()
+ports_in_use = set()
 download_binary_lock = threading.Lock()
 
+# Shared across health checks and downloads so that retries and concurrent backends reuse
+# keep-alive connections instead of opening a fresh socket per request.
+session = requests.Session()
+session.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=64))
+
+# (connect, read) timeouts in seconds.
+request_timeout = (2, 10)
 
+
+# Let the kernel assign a free port and hold it with a bound socket until the backend is about
+# to start. Ports handed out in this process are tracked so that a port released by one start
+# and reissued by the kernel can't be given to two backends at once.
+def reserve_port() -> socket.socket:
+    while True:
+        s = socket.socket()
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(("", 0))
+        port = s.getsockname()[1]
+        with ports_in_use_lock:
+            if port not in ports_in_use:
+                ports_in_use.add(port)
+                return s
+        s.close()
+
+
+def release_ports(*ports: int):
+    with ports_in_use_lock:
+        ports_in_use.difference_update(ports)
+
+
+def port_is_listening(port: int) -> bool:
+    with socket.socket() as s:
+        s.settimeout(0.025)
+        return s.connect_ex(("localhost", port)) == 0
+
+
+binary_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+binary_future_lock = threading.Lock()
+binary_future = None
+
+
+# Start resolving (and, if needed, downloading) the convex binary in the background so that
+# callers can overlap it with other work. Returns a future for the binary path; a failed
+# resolution is retried on the next call.
+def prefetch_binary() -> concurrent.futures.Future:
+    global binary_future
+    with binary_future_lock:
+        if binary_future is None or (binary_future.done() and binary_future.exception() is not None):
+            binary_future = binary_executor.submit(download_convex_binary)
+        return binary_future
+
+
+# The resolved path only depends on the host platform and the latest release, so
+# resolve it at most once per process and skip the GitHub API call on warm starts.
+@functools.cache
 def download_convex_binary():
+    binary_dir = os.path.expanduser("~/.convex-evals/releases")
+
+    # Reuse the most recently downloaded release if there is one, and only ask GitHub for the
+    # latest release when there isn't (or when CONVEX_FORCE_LATEST is set).
+    if not os.getenv("CONVEX_FORCE_LATEST"):
+        existing = [
+            path for path in glob.glob(os.path.join(binary_dir, "convex-local-backend-*")) if not path.endswith(".zip")
+        ]
+        if existing:
+            return max(existing, key=os.path.getmtime)
+
     latest = fetch_convex_release()
     version = latest["tag_name"]
 
@@ -180,7 +336,6 @@ def download_convex_binary():
     if not matching_asset:
         raise RuntimeError(f"Could not find matching asset for {target_pattern}")
 
-    binary_dir = os.path.expanduser("~/.convex-evals/releases")
     os.makedirs(binary_dir, exist_ok=True)
 
     # Include version in binary name
@@ -189,42 +344,43 @@ def download_convex_binary():
         binary_name += ".exe"
     binary_path = os.path.join(binary_dir, binary_name)
 
-    if os.path.exists(binary_path):
-        return binary_path
-
+    # Warm calls are answered by the cache and never get here, so a single check under the lock
+    # is enough.
     with download_binary_lock:
-        if os.path.exists(binary_path):
+        try:
+            os.stat(binary_path)
             return binary_path
+        except FileNotFoundError:
+            pass
 
         print("Latest release:", version)
 
         url = matching_asset["browser_download_url"]
         print("Downloading:", url)
-        response = requests.get(url, stream=True)
+        response = session.get(url, stream=True, timeout=request_timeout)
         response.raise_for_status()
 
-        zip_path = os.path.join(binary_dir, matching_asset["name"])
-        with open(zip_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+        # Buffer the archive in memory rather than writing it to disk and reading it back.
+        archive = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            archive.write(chunk)
         print("Downloaded:", matching_asset["name"])
 
-        # Unzip the file
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_ref.extractall(binary_dir)
+        # Unzip the binary
+        import zipfile
 
-        # Rename the extracted binary to include version
-        extracted_binary = os.path.join(binary_dir, "convex-local-backend")
+        extracted_name = "convex-local-backend"
         if platform.system() == "Windows":
-            extracted_binary += ".exe"
+            extracted_name += ".exe"
+        with zipfile.ZipFile(archive, "r") as zip_ref:
+            extracted_binary = zip_ref.extract(extracted_name, binary_dir)
+
+        # Rename the extracted binary to include version
         os.rename(extracted_binary, binary_path)
 
         # Make the binary executable on Unix systems
         if platform.system() != "Windows":
             os.chmod(binary_path, 0o755)
-
-        # Clean up zip file
-        os.remove(zip_path)
         print("Extracted binary to:", binary_path)
 
     return binary_path
@@ -232,7 +388,9 @@ def download_convex_binary():
 
 @functools.cache
 def fetch_convex_release():
-    releases = requests.get("https://api.github.com/repos/get-convex/convex-backend/releases").json()
+    releases = session.get(
+        "https://api.github.com/repos/get-convex/convex-backend/releases", timeout=request_timeout
+    ).json()
     return releases[0]
 
 
@@ -253,18 +411,23 @@ class GuidelineSection:
         self.children = children
 
 
-def render_guidelines(node: Union[GuidelineSection, Guideline], header="#"):
+# Linearize a guideline tree by DFS into `(prefix, line)` pairs, where the prefix is the heading
+# marker or list bullet for that line.
+def flatten_guidelines(node: Union[GuidelineSection, Guideline], header="#") -> tuple[tuple[str, str], ...]:
     if isinstance(node, Guideline):
-        yield "- "
-        yield "\n".join(line.strip() for line in node.content.strip().splitlines())
-        yield "\n"
-    else:
-        words = node.name.split("_")
-        words[0] = words[0].capitalize()
-        yield f"{header} {' '.join(words)}\n"
-        for child in node.children:
-            yield from render_guidelines(child, header + "#")
-        yield "\n"
+        content = "\n".join(line.strip() for line in node.content.strip().splitlines())
+        return (("- ", f"{content}\n"),)
+    words = node.name.split("_")
+    words[0] = words[0].capitalize()
+    out = [(f"{header} ", f"{' '.join(words)}\n")]
+    for child in node.children:
+        out.extend(flatten_guidelines(child, header + "#"))
+    out.append(("", "\n"))
+    return tuple(out)
+
+
+def render_guidelines(flat_guidelines: tuple[tuple[str, str], ...]) -> str:
+    return "".join([prefix + line for prefix, line in flat_guidelines])
 
 
 CONVEX_GUIDELINES = GuidelineSection(
@@ -572,25 +735,20 @@ CONVEX_GUIDELINES = GuidelineSection(
     ],
 )
 
+FLAT_CONVEX_GUIDELINES = flatten_guidelines(CONVEX_GUIDELINES)
+RENDERED_CONVEX_GUIDELINES = render_guidelines(FLAT_CONVEX_GUIDELINES)
+
 
 def render_examples(example_dir: str):
     yield "# Examples:\n"
-    for example in os.listdir(example_dir):
-        example_path = os.path.join(example_dir, example)
-        if not os.path.isdir(example_path):
-            continue
+    with os.scandir(example_dir) as entries:
+        examples = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
 
-        task_description = open(os.path.join(example_path, "TASK.txt"), "r").read()
-        analysis = open(os.path.join(example_path, "ANALYSIS.txt"), "r").read()
-
-        file_paths = []
-        for dirpath, _, file_names in os.walk(example_path, topdown=True):
-            if "node_modules" in dirpath or "_generated" in dirpath:
-                continue
-            for file_name in file_names:
-                if file_name == "package.json" or file_name.endswith(".ts"):
-                    file_paths.append(os.path.join(dirpath, file_name))
+    for example, example_path in examples:
+        task_description = read_text(os.path.join(example_path, "TASK.txt"))
+        analysis = read_text(os.path.join(example_path, "ANALYSIS.txt"))
 
+        file_paths = list(find_example_files(example_path))
         file_paths.sort(key=lambda x: (x.count("/"), x))
 
         yield f"## Example: {example}\n\n"
@@ -601,6 +759,22 @@ def render_examples(example_dir: str):
         yield "### Implementation\n\n"
         for file_path in file_paths:
             rel_path = os.path.relpath(file_path, example_path)
-            file_content = open(file_path, "r").read().strip()
+            file_content = read_text(file_path).strip()
             yield f"#### {rel_path}\n"
             yield f"```typescript\n{file_content}\n```\n\n"
+
+
+def find_example_files(dir_path: str):
+    # Prune dependency and codegen directories at the entry level so we never descend into them.
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ("node_modules", "_generated"):
+                    yield from find_example_files(entry.path)
+            elif entry.name == "package.json" or entry.name.endswith(".ts"):
+                yield entry.path
+
+
+def read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
@@ -1,7 +1,6 @@
+import functools
 import os
 
-import modal
-
 from backends import Backend
 from evaluation.api import ApiDescription
 
@@ -9,10 +8,7 @@ from evaluation.api import ApiDescription
 class FastAPIBackend(Backend):
     @classmethod
     def api_prompt(cls, endpoints: list[ApiDescription]) -> str:
-        out = []
-        for endpoint in endpoints:
-            out.append(f"- {endpoint.method} /api/{endpoint.name}: {endpoint.description}")
-        return "\n".join(out)
+        return render_api_prompt(tuple(endpoints))
 
     @classmethod
     def description(cls) -> str:
@@ -28,6 +24,8 @@ class FastAPIBackend(Backend):
         self.project_dir = os.path.join(temp_dir, "project")
 
     def start(self):
+        import modal
+
         image = modal.Image.debian_slim()
         requirements_path = os.path.join(self.project_dir, "requirements.txt")
         if os.path.exists(requirements_path):
@@ -52,3 +50,8 @@ class FastAPIBackend(Backend):
 
     def deploy(self):
         pass
+
+
+@functools.lru_cache(maxsize=256)
+def render_api_prompt(endpoints: tuple[ApiDescription, ...]) -> str:
+    return "\n".join([f"- {endpoint.method} /api/{endpoint.name}: {endpoint.description}" for endpoint in endpoints])
@@ -1,7 +1,11 @@
 import re
+from dataclasses import dataclass
 from enum import Enum
 
-from pydantic import BaseModel, validator
+NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_]*\Z")
+
+# Matches a line break along with any surrounding non-newline whitespace.
+LINE_BREAK_PATTERN = re.compile(r"[^\S\n]*\n[^\S\n]*")
 
 
 class HttpMethod(str, Enum):
@@ -9,23 +13,29 @@ class HttpMethod(str, Enum):
     POST = "POST"
 
 
-class ApiDescription(BaseModel):
+@dataclass(frozen=True)
+class ApiDescription:
     """Describes an API endpoint with name, HTTP method, and JSON schema
     validation."""
 
+    __slots__ = ("name", "method", "description")
+
     name: str
     method: HttpMethod
     description: str
 
-    @validator("name")
-    def validate_name_format(cls, v):
-        if not re.match(r"^[a-z][a-z0-9_]*$", v):
+    def __post_init__(self):
+        if not NAME_PATTERN.match(self.name):
             raise ValueError("name must be snake_case, lowercase, and contain no whitespace")
-        return v
-
-    @validator("description")
-    def clean_description(cls, v):
-        return "\n".join(line.strip() for line in v.strip().splitlines())
-
-    class Config:
-        frozen = True  # Makes instances immutable
+        # Instances are immutable, so normalize fields through `object.__setattr__`.
+        object.__setattr__(self, "method", HttpMethod(self.method))
+        object.__setattr__(self, "description", LINE_BREAK_PATTERN.sub("\n", self.description.strip()))
+
+    # Frozen dataclasses with hand-written `__slots__` can't be restored by the default pickle/copy
+    # protocol on Python 3.9, since it assigns fields with `setattr`.
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
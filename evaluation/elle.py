@@ -0,0 +1,41 @@
+from dataclasses import dataclass
+
+import orjson
+
+
+@dataclass
+class HistoryEntry:
+    """A single operation in an Elle history. Serialized directly by orjson."""
+
+    __slots__ = ("type", "f", "value", "process", "index")
+
+    type: str
+    f: str
+    value: list
+    process: int
+    index: int
+
+
+class HistoryWriter:
+    """Streams history entries to a file as a JSON array as they're recorded, rather than
+    holding the whole history in memory and dumping it at the end."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.num_entries = 0
+        self.f = open(path, "wb")
+
+    def append(self, entry: HistoryEntry):
+        self.f.write(b"," if self.num_entries else b"[")
+        self.f.write(orjson.dumps(entry))
+        self.num_entries += 1
+
+    def close(self):
+        self.f.write(b"]" if self.num_entries else b"[]")
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,3 +1,4 @@
+import functools
 from abc import ABC, abstractmethod
 
 from backends import Backend
@@ -13,6 +14,10 @@ class Task(ABC):
     def api_description(self) -> list[ApiDescription]:
         pass
 
+    @functools.cached_property
+    def endpoints_by_name(self) -> dict[str, ApiDescription]:
+        return {endpoint.name: endpoint for endpoint in self.api_description()}
+
     @abstractmethod
     def postlude(self) -> str:
         pass
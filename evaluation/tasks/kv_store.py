@@ -1,9 +1,10 @@
-import json
+import concurrent.futures
 import random
 import time
 
 from backends import Backend
 from evaluation.api import ApiDescription, HttpMethod
+from evaluation.elle import HistoryEntry, HistoryWriter
 from evaluation.task import Task
 
 prelude = "Write a high performance, correct backend server that implements the following API:"
@@ -51,10 +52,11 @@ class KvStoreTask(Task):
         return postlude
 
     def grade(self, backend: Backend) -> dict[str, float]:
-        scores = {}
-        scores["basic_put_get"] = self.test_basic_put_get(backend)
-        scores["elle"] = self.test_elle(backend)
-        return scores
+        # The subtests use disjoint keys, so run them concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            basic_put_get = executor.submit(self.test_basic_put_get, backend)
+            elle = executor.submit(self.test_elle, backend)
+            return {"basic_put_get": basic_put_get.result(), "elle": elle.result()}
 
     def test_basic_put_get(self, backend: Backend):
         try:
@@ -76,60 +78,61 @@ class KvStoreTask(Task):
             transaction_size = 4
             run_id = int(time.time())
 
-            history = []
-
             # Create seeded RNG for reproducible tests
             rng = random.Random(42)  # Fixed seed for reproducibility
 
             num_keys = 8
             keys = [f"elle:{run_id}:{i}" for i in range(num_keys)]
 
-            for i in range(num_transactions):
-                is_read = rng.random() < 0.8
-                if is_read:
-                    keys_to_read = random.sample(keys, transaction_size)
-
-                    invoke_entry = {
-                        "type": "invoke",
-                        "f": "get",
-                        "value": [["r", k, None] for k in keys_to_read],
-                        "process": 0,
-                        "index": len(history),
-                    }
-                    history.append(invoke_entry)
-                    resp = backend.call_api(self, "get", {"keys": keys_to_read})
-                    ok_entry = {
-                        "type": "ok",
-                        "value": [["r", pair["key"], pair["value"]] for pair in resp],
-                        "process": 0,
-                        "index": len(history),
-                    }
-                    history.append(ok_entry)
-                else:
-                    kv_pairs = [
-                        {"key": keys[rng.randint(0, num_keys - 1)], "value": rng.randint(0, 100)}
-                        for _ in range(transaction_size)
-                    ]
-                    invoke_entry = {
-                        "type": "invoke",
-                        "f": "put",
-                        "value": [["w", pair["key"], pair["value"]] for pair in kv_pairs],
-                        "process": 0,
-                        "index": len(history),
-                    }
-                    history.append(invoke_entry)
-                    backend.call_api(self, "put", {"kv_pairs": kv_pairs})
-                    ok_entry = {
-                        "type": "ok",
-                        "value": [["w", pair["key"], pair["value"]] for pair in kv_pairs],
-                        "process": 0,
-                        "index": len(history),
-                    }
-                    history.append(ok_entry)
-
-            with open(f"/tmp/elle-{run_id}.json", "w") as f:
-                json.dump(history, f)
-                print(f"Wrote history to /tmp/elle-{run_id}.json")
+            # Draw every write's keys and values in one batch up front.
+            write_keys = rng.choices(keys, k=num_transactions * transaction_size)
+            write_values = rng.choices(range(101), k=num_transactions * transaction_size)
+
+            with HistoryWriter(f"/tmp/elle-{run_id}.json") as history:
+                for i in range(num_transactions):
+                    is_read = rng.random() < 0.8
+                    if is_read:
+                        keys_to_read = rng.sample(keys, transaction_size)
+
+                        invoke_entry = HistoryEntry(
+                            type="invoke",
+                            f="get",
+                            value=[["r", k, None] for k in keys_to_read],
+                            process=0,
+                            index=history.num_entries,
+                        )
+                        history.append(invoke_entry)
+                        resp = backend.call_api(self, "get", {"keys": keys_to_read})
+                        ok_entry = HistoryEntry(
+                            type="ok",
+                            f="get",
+                            value=[["r", pair["key"], pair["value"]] for pair in resp],
+                            process=0,
+                            index=history.num_entries,
+                        )
+                        history.append(ok_entry)
+                    else:
+                        ops = range(i * transaction_size, (i + 1) * transaction_size)
+                        kv_pairs = [{"key": write_keys[j], "value": write_values[j]} for j in ops]
+                        invoke_entry = HistoryEntry(
+                            type="invoke",
+                            f="put",
+                            value=[["w", pair["key"], pair["value"]] for pair in kv_pairs],
+                            process=0,
+                            index=history.num_entries,
+                        )
+                        history.append(invoke_entry)
+                        backend.call_api(self, "put", {"kv_pairs": kv_pairs})
+                        ok_entry = HistoryEntry(
+                            type="ok",
+                            f="put",
+                            value=[["w", pair["key"], pair["value"]] for pair in kv_pairs],
+                            process=0,
+                            index=history.num_entries,
+                        )
+                        history.append(ok_entry)
+
+            print(f"Wrote history to {history.path}")
 
             return 1.0
         except Exception as e:
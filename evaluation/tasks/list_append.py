@@ -1,16 +1,19 @@
+import collections
 import concurrent.futures
-import json
+import itertools
+import operator
 import os
 import random
 import subprocess
 import tempfile
-import threading
 import time
+from dataclasses import dataclass
 
-from pydantic import BaseModel
+import orjson
 
 from backends import Backend
 from evaluation.api import ApiDescription, HttpMethod
+from evaluation.elle import HistoryEntry
 from evaluation.task import Task
 
 prelude = "Write a high performance, correct backend server that implements the following API:"
@@ -45,7 +48,10 @@ The system will be evaluated for correctness, even highly concurrent load.
 """
 
 
-class ElleConfig(BaseModel):
+@dataclass(frozen=True)
+class ElleConfig:
+    __slots__ = ("num_keys", "num_transactions", "transaction_size", "concurrency", "read_probability")
+
     num_keys: int
     num_transactions: int
     transaction_size: int
@@ -53,6 +59,14 @@ class ElleConfig(BaseModel):
 
     read_probability: float
 
+    # See `ApiDescription`: frozen + `__slots__` needs explicit state handling to pickle on 3.9.
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
 
 class ListAppendTask(Task):
     def __init__(self):
@@ -74,10 +88,11 @@ class ListAppendTask(Task):
         return postlude
 
     def grade(self, backend: Backend) -> dict[str, float]:
-        scores = {}
-        scores["basic_append"] = self.test_basic_append(backend)
-        scores["elle"] = self.test_elle(backend)
-        return scores
+        # The subtests use disjoint keys, so run them concurrently.
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            basic_append = executor.submit(self.test_basic_append, backend)
+            elle = executor.submit(self.test_elle, backend)
+            return {"basic_append": basic_append.result(), "elle": elle.result()}
 
     def test_basic_append(self, backend: Backend):
         try:
@@ -113,64 +128,62 @@ class ListAppendTask(Task):
             rng = random.Random(run_id)
 
             keys = [str(i) for i in range(self.elle_config.num_keys)]
-            history = []
-            lock = threading.Lock()
+            # Workers record into a shared deque (whose `append` is atomic) with indices drawn from a
+            # shared counter (`next` on `itertools.count` is atomic too), so they never contend on a
+            # lock. Entries can land slightly out of index order, so we sort at the end.
+            history = collections.deque()
+            index = itertools.count()
 
             def run_transaction(i, transaction, tuples):
-                with lock:
-                    invoke_entry = {
-                        "type": "invoke",
-                        "f": "append",
-                        "value": tuples,
-                        "process": i,
-                        "index": len(history),
-                    }
-                    history.append(invoke_entry)
+                history.append(HistoryEntry(type="invoke", f="append", value=tuples, process=i, index=next(index)))
 
                 resp = backend.call_api(self, "append", {"transaction": transaction})
 
-                with lock:
-                    resp_tuples = []
-                    for op in resp:
-                        if op["type"] == "read":
-                            resp_tuples.append(("r", op["key"], [int(v) for v in op["value"]]))
-                        else:
-                            resp_tuples.append(("append", op["key"], int(op["value"])))
-                    ok_entry = {
-                        "type": "ok",
-                        "value": resp_tuples,
-                        "process": i,
-                        "index": len(history),
-                    }
-                    history.append(ok_entry)
+                resp_tuples = []
+                for op in resp:
+                    if op["type"] == "read":
+                        resp_tuples.append(("r", op["key"], [int(v) for v in op["value"]]))
+                    else:
+                        resp_tuples.append(("append", op["key"], int(op["value"])))
+                history.append(HistoryEntry(type="ok", f="append", value=resp_tuples, process=i, index=next(index)))
+
+            # Generate every transaction up front so that workers start as soon as they're
+            # submitted and RNG calls don't interleave with dispatch.
+            transaction_size = self.elle_config.transaction_size
+            num_ops = self.elle_config.num_transactions * transaction_size
+            op_is_read = [rng.random() < self.elle_config.read_probability for _ in range(num_ops)]
+            op_keys = rng.choices(keys, k=num_ops)
+            op_values = rng.choices(range(1000001), k=num_ops)
+
+            transactions = []
+            for i in range(self.elle_config.num_transactions):
+                transaction = []
+                tuples = []
+                for j in range(i * transaction_size, (i + 1) * transaction_size):
+                    key = op_keys[j]
+                    if op_is_read[j]:
+                        transaction.append({"type": "read", "key": key})
+                        tuples.append(("r", key, None))
+                    else:
+                        value = op_values[j]
+                        transaction.append({"type": "append", "key": key, "value": value})
+                        tuples.append(("append", key, value))
+                transactions.append((transaction, tuples))
 
             with concurrent.futures.ThreadPoolExecutor(max_workers=self.elle_config.concurrency) as executor:
                 futures = []
-
-                for i in range(self.elle_config.num_transactions):
-                    transaction = []
-                    tuples = []
-                    for j in range(self.elle_config.transaction_size):
-                        is_read = rng.random() < self.elle_config.read_probability
-                        if is_read:
-                            key = keys[rng.randint(0, self.elle_config.num_keys - 1)]
-                            transaction.append({"type": "read", "key": key})
-                            tuples.append(("r", key, None))
-                        else:
-                            key = keys[rng.randint(0, self.elle_config.num_keys - 1)]
-                            value = rng.randint(0, 1000000)
-                            transaction.append({"type": "append", "key": key, "value": value})
-                            tuples.append(("append", key, value))
-
+                for i, (transaction, tuples) in enumerate(transactions):
                     futures.append(executor.submit(run_transaction, i, transaction, tuples))
 
                 for future in concurrent.futures.as_completed(futures):
                     future.result()
 
+            history = sorted(history, key=operator.attrgetter("index"))
+
             tmpdir = tempfile.mkdtemp()
 
-            with open(f"{tmpdir}/history.json", "w") as f:
-                json.dump(history, f)
+            with open(f"{tmpdir}/history.json", "wb") as f:
+                f.write(orjson.dumps(history))
 
             os.makedirs(f"{tmpdir}/failure")
 
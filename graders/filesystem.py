@@ -3,6 +3,9 @@ import tempfile
 
 from models import ModelResponse
 
+# `dir_fd` and `O_DIRECTORY` aren't available everywhere (notably Windows), so fall back to plain paths there.
+use_dir_fds = hasattr(os, "O_DIRECTORY") and os.open in os.supports_dir_fd and os.mkdir in os.supports_dir_fd
+
 
 def write_files(response: ModelResponse) -> str:
     temp_dir = tempfile.mkdtemp()
@@ -10,21 +13,62 @@ def write_files(response: ModelResponse) -> str:
     project_dir = os.path.join(temp_dir, "project")
     os.makedirs(project_dir, exist_ok=True)
 
-    for path, content in response.files.items():
+    # Resolve symlinks too, so a path can't escape through a symlink that `startswith` would miss.
+    base_dir = os.path.realpath(temp_dir)
+    rel_paths = {}
+    for path in response.files:
         out_path = os.path.join(project_dir, path)
 
-        if not os.path.abspath(out_path).startswith(os.path.abspath(temp_dir)):
+        if os.path.commonpath([base_dir, os.path.realpath(out_path)]) != base_dir:
             raise ValueError(f"File path {out_path} is not within the temporary directory {temp_dir}")
 
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        rel_paths[path] = os.path.relpath(out_path, project_dir)
+
+    if use_dir_fds:
+        write_files_at_dir_fds(project_dir, rel_paths, response.files)
+    else:
+        # Create each parent directory once, shallowest first, rather than once per file.
+        out_paths = {path: os.path.join(project_dir, rel_path) for path, rel_path in rel_paths.items()}
+        for dir_path in sorted({os.path.dirname(out_path) for out_path in out_paths.values()}, key=len):
+            os.makedirs(dir_path, exist_ok=True)
 
-        with open(out_path, "w") as f:
-            f.write(content)
+        for path, content in response.files.items():
+            with open(out_paths[path], "wb") as f:
+                f.write(content.encode("utf-8"))
 
-    with open(os.path.join(temp_dir, "PROMPT.txt"), "w") as f:
-        f.write(response.prompt)
+    with open(os.path.join(temp_dir, "PROMPT.txt"), "wb") as f:
+        f.write(response.prompt.encode("utf-8"))
 
-    with open(os.path.join(temp_dir, "RESPONSE.txt"), "w") as f:
-        f.write(response.response_text)
+    with open(os.path.join(temp_dir, "RESPONSE.txt"), "wb") as f:
+        f.write(response.response_text.encode("utf-8"))
 
     return temp_dir
+
+
+# Create directories and files relative to open directory fds so that the kernel only resolves each
+# directory's path once, rather than walking the full prefix for every file.
+def write_files_at_dir_fds(project_dir: str, rel_paths: dict[str, str], files: dict[str, str]):
+    dir_fds = {"": os.open(project_dir, os.O_RDONLY | os.O_DIRECTORY)}
+    try:
+        for path, content in files.items():
+            parent, name = os.path.split(rel_paths[path])
+            fd = os.open(name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666, dir_fd=open_dir(dir_fds, parent))
+            with open(fd, "wb") as f:
+                f.write(content.encode("utf-8"))
+    finally:
+        for fd in dir_fds.values():
+            os.close(fd)
+
+
+# Open (creating if needed) a directory relative to the project root, caching its fd in `dir_fds`.
+def open_dir(dir_fds: dict[str, int], rel_dir: str) -> int:
+    if rel_dir in dir_fds:
+        return dir_fds[rel_dir]
+    parent, name = os.path.split(rel_dir)
+    parent_fd = open_dir(dir_fds, parent)
+    try:
+        os.mkdir(name, dir_fd=parent_fd)
+    except FileExistsError:
+        pass
+    dir_fds[rel_dir] = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=parent_fd)
+    return dir_fds[rel_dir]
@@ -1,6 +1,6 @@
 from dotenv import load_dotenv
 
-from backends.convex import ConvexBackend
+from backends.convex import ConvexBackend, prefetch_binary
 from evaluation.tasks.list_append import list_append_task
 from graders.filesystem import write_files
 from models.openai.o1 import O1Model
@@ -10,6 +10,9 @@ load_dotenv()
 model = O1Model()
 task = list_append_task
 
+# Fetch the backend binary while we wait on the model.
+prefetch_binary()
+
 response = model.execute(ConvexBackend, task)
 
 temp_dir = write_files(response)
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 
-from pydantic import BaseModel
 from typing_extensions import TypeAlias
 
 from backends import Backend
@@ -10,11 +10,22 @@ RelativePath: TypeAlias = str
 FileContent: TypeAlias = str
 
 
-class ModelResponse(BaseModel):
+@dataclass(frozen=True)
+class ModelResponse:
+    __slots__ = ("prompt", "response_text", "files")
+
     prompt: str
     response_text: str
     files: dict[RelativePath, FileContent]
 
+    # See `ApiDescription`: frozen + `__slots__` needs explicit state handling to pickle on 3.9.
+    def __getstate__(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
 
 class Model(ABC):
     @abstractmethod
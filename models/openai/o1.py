@@ -1,3 +1,4 @@
+import functools
 import os
 
 from markdown_it import MarkdownIt
@@ -28,23 +29,24 @@ int main() {
 """
 
 
+# Share one client (and its connection pool) across all model instances.
+@functools.cache
+def openai_client() -> OpenAI:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("OPENAI_API_KEY environment variable not set")
+    return OpenAI(
+        api_key=api_key,
+        base_url="https://api.braintrust.dev/v1/proxy",
+    )
+
+
 class O1Model:
     def __init__(self):
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY environment variable not set")
-        self.client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.braintrust.dev/v1/proxy",
-        )
+        self.client = openai_client()
 
     def execute(self, backend: Backend, task: Task) -> ModelResponse:
-        prompt = "# Task\n"
-        prompt += task.prelude()
-        prompt += f"\n{backend.api_prompt(task.api_description())}\n"
-        prompt += task.postlude()
-        prompt += f"\n{backend.description()}\n"
-        prompt += FORMAT_PROMPT
+        prompt = build_prompt(backend, task)
 
         response = self.client.chat.completions.create(
             model="o1",
@@ -53,6 +55,8 @@ class O1Model:
             ],
             max_completion_tokens=16384,
             seed=1,
+            # The request is deterministic, so let the Braintrust proxy serve repeats from its cache.
+            extra_headers={"x-bt-use-cache": "always"},
         )
         text = response.choices[0].message.content
 
@@ -63,21 +67,33 @@ class O1Model:
         current_file = None
         in_files_section = False
 
-        for i, token in enumerate(tokens):
-            if token.type == "heading_open" and token.tag == "h1":
-                title_token = tokens[i + 1]
-                if title_token.content == "Files":
+        # Walk the tokens with an explicit iterator: a heading is always followed by its inline title
+        # token, so consume that directly instead of indexing back into the list.
+        it = iter(tokens)
+        for token in it:
+            if token.type == "heading_open":
+                title = next(it).content
+                if token.tag == "h1" and title == "Files":
                     in_files_section = True
-                    continue
-
-            if not in_files_section:
-                continue
-
-            if token.type == "heading_open" and token.tag == "h2":
-                title_token = tokens[i + 1]
-                current_file = title_token.content.strip()
-            elif token.type == "fence" and current_file:
+                elif in_files_section and token.tag == "h2":
+                    current_file = title.strip()
+            elif token.type == "fence" and in_files_section and current_file:
                 files[current_file] = token.content.strip()
                 current_file = None
 
         return ModelResponse(prompt=prompt, response_text=text, files=files)
+
+
+# Prompts only depend on the backend class and the task, so build each one once.
+@functools.lru_cache(maxsize=32)
+def build_prompt(backend: type[Backend], task: Task) -> str:
+    return "".join(
+        [
+            "# Task\n",
+            task.prelude(),
+            f"\n{backend.api_prompt(task.api_description())}\n",
+            task.postlude(),
+            f"\n{backend.description()}\n",
+            FORMAT_PROMPT,
+        ]
+    )